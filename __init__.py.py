@@ -6,15 +6,16 @@ A comprehensive geospatial analysis library with interactive mapping capabilitie
 __version__ = "1.0.0"
 __author__ = "neovenator99"
 
-from layered_earth.ui.main_app import launch_app
-
-def launch():
+def launch(**kwargs):
     """Launch the Layered-Earth application"""
-    return launch_app()
+    # Imported here so headless users (e.g. the batch runner) never pull in matplotlib
+    from layered_earth.ui.main_app import launch_app
+    return launch_app(**kwargs)
 
-def quick_start():
+def quick_start(**kwargs):
     """Quick start with sample data"""
-    app = launch_app()
+    from layered_earth.ui.main_app import launch_app
+    app = launch_app(**kwargs)
     return app
 
 __all__ = ['launch', 'quick_start']
\ No newline at end of file
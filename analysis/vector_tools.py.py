@@ -1,4 +1,13 @@
 import geopandas as gpd
+import numpy as np
+
+from layered_earth.core.point_layer import PointLayer
+
+def _as_geodataframe(layer):
+    """Return a GeoDataFrame for either a GeoDataFrame or a PointLayer"""
+    if isinstance(layer, PointLayer):
+        return layer.to_geodataframe()
+    return layer
 
 class VectorAnalysis:
     def __init__(self):
@@ -6,18 +15,28 @@ class VectorAnalysis:
             'buffer': self.buffer_analysis,
             'intersect': self.intersection_analysis,
             'clip': self.clip_analysis,
+            'proximity': self.proximity_analysis,
         }
     
     def buffer_analysis(self, gdf, distance):
         """Create buffer around features"""
-        buffered = gdf.copy()
+        buffered = _as_geodataframe(gdf).copy()
         buffered.geometry = buffered.geometry.buffer(distance)
         return buffered
     
     def intersection_analysis(self, gdf1, gdf2):
         """Find intersection between two layers"""
-        return gpd.overlay(gdf1, gdf2, how='intersection')
+        return gpd.overlay(_as_geodataframe(gdf1), _as_geodataframe(gdf2), how='intersection')
     
     def clip_analysis(self, gdf_to_clip, gdf_clipper):
         """Clip one layer with another"""
-        return gpd.clip(gdf_to_clip, gdf_clipper)
\ No newline at end of file
+        return gpd.clip(_as_geodataframe(gdf_to_clip), _as_geodataframe(gdf_clipper))
+    
+    def proximity_analysis(self, layer, x, y, distance):
+        """Select features within distance of a location"""
+        if isinstance(layer, PointLayer):
+            # Select on the coordinate arrays, only the hits become geometries
+            return layer.take(layer.within_distance(x, y, distance)).to_geodataframe()
+        
+        distances = layer.geometry.distance(gpd.points_from_xy([x], [y])[0])
+        return layer[np.asarray(distances <= distance)]
\ No newline at end of file
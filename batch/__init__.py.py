@@ -0,0 +1 @@
+# Headless batch processing for Layered-Earth
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Headless batch runner for Layered-Earth.
+
+Loads layers through LayerManager, applies a pipeline of VectorAnalysis
+tools declared in a YAML or JSON file and writes each result to GeoParquet
+or GeoPackage. Nothing in this module imports matplotlib.
+
+Example pipeline:
+
+    inputs:
+      - data/quakes_2023.geojson
+      - data/stations.csv
+    output_dir: out
+    format: parquet          # or gpkg
+    workers: 4
+    steps:
+      - tool: buffer
+        distance: 0.5
+      - tool: clip
+        layer: data/region.geojson
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from layered_earth.core.layer_manager import LayerManager
+from layered_earth.analysis.vector_tools import VectorAnalysis
+
+OUTPUT_FORMATS = {
+    'parquet': '.parquet',
+    'gpkg': '.gpkg',
+}
+
+
+def load_pipeline(pipeline_path):
+    """Load a pipeline definition from a YAML or JSON file"""
+    pipeline_path = Path(pipeline_path)
+    with open(pipeline_path, 'r', encoding='utf-8') as fh:
+        if pipeline_path.suffix.lower() in ['.yaml', '.yml']:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required for YAML pipelines: pip install pyyaml")
+            pipeline = yaml.safe_load(fh)
+        else:
+            pipeline = json.load(fh)
+
+    if not pipeline.get('inputs'):
+        raise ValueError("Pipeline has no inputs")
+
+    resolved = [str(Path(path).resolve()) for path in pipeline['inputs']]
+    duplicates = sorted({path for path in resolved if resolved.count(path) > 1})
+    if duplicates:
+        raise ValueError(f"Pipeline lists the same input more than once: {duplicates}")
+
+    output_format = pipeline.get('format', 'parquet')
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {list(OUTPUT_FORMATS)}")
+
+    tools = VectorAnalysis().available_tools
+    for step in pipeline.get('steps', []):
+        if step.get('tool') not in tools:
+            raise ValueError(f"Unknown tool '{step.get('tool')}', expected one of {list(tools)}")
+
+    return pipeline
+
+
+def run_steps(gdf, steps, layer_manager, vector_tools):
+    """Apply pipeline steps to a GeoDataFrame in order"""
+    for step in steps:
+        params = dict(step)
+        tool = vector_tools.available_tools[params.pop('tool')]
+
+        # Two-layer tools (intersect, clip) take the other layer as a file path
+        if 'layer' in params:
+            other = layer_manager.load_file(params.pop('layer'))
+            gdf = tool(gdf, other, **params)
+        else:
+            gdf = tool(gdf, **params)
+    return gdf
+
+
+def output_paths(inputs, output_dir, output_format):
+    """
+    Map each input to a unique output path.
+
+    Outputs mirror the inputs' directories relative to their common root and
+    keep the input's extension in the name, so a/pts.csv, b/pts.csv and
+    a/pts.geojson never write to the same file.
+    """
+    resolved = [Path(path).resolve() for path in inputs]
+    root = Path(os.path.commonpath([str(path.parent) for path in resolved]))
+
+    paths = {}
+    for path, full_path in zip(inputs, resolved):
+        relative = full_path.relative_to(root)
+        name = relative.name.replace('.', '_') + OUTPUT_FORMATS[output_format]
+        paths[str(path)] = str(Path(output_dir) / relative.parent / name)
+    return paths
+
+
+def pipeline_signature(pipeline):
+    """Hash of the settings that determine a run's outputs"""
+    settings = {
+        'steps': pipeline.get('steps', []),
+        'format': pipeline.get('format', 'parquet'),
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def write_output(gdf, output_path, output_format, layer_name):
+    """Write a result layer to GeoParquet or GeoPackage"""
+    if output_format == 'parquet':
+        gdf.to_parquet(output_path)
+    else:
+        gdf.to_file(output_path, driver='GPKG', layer=layer_name)
+
+
+def process_file(input_path, steps, output_path, output_format):
+    """Load, process and write a single input file (runs in a worker process)"""
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+    layer_manager = LayerManager()
+    vector_tools = VectorAnalysis()
+
+    gdf = layer_manager.load_file(input_path)
+    if gdf is None:
+        raise ValueError(f"Unsupported file format: {input_path.suffix}")
+    gdf = run_steps(gdf, steps, layer_manager, vector_tools)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_output(gdf, output_path, output_format, input_path.stem)
+    return str(output_path), len(gdf)
+
+
+class BatchRunner:
+    def __init__(self, pipeline, workers=None, checkpoint_path=None):
+        self.pipeline = pipeline
+        self.workers = workers or pipeline.get('workers')
+        self.output_dir = Path(pipeline.get('output_dir', 'output'))
+        self.output_format = pipeline.get('format', 'parquet')
+        self.checkpoint_path = Path(checkpoint_path or self.output_dir / '.layered_earth_checkpoint.json')
+        self.outputs = output_paths(pipeline['inputs'], self.output_dir, self.output_format)
+        self.signature = pipeline_signature(pipeline)
+        self.completed = {}
+        self.failed = {}
+
+    def load_checkpoint(self):
+        """
+        Load inputs already processed by a previous run.
+
+        Entries are only kept if the steps and format are unchanged and the
+        recorded output is still the expected file and exists on disk.
+        """
+        self.completed = {}
+        if not self.checkpoint_path.exists():
+            return self.completed
+
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as fh:
+            checkpoint = json.load(fh)
+
+        if checkpoint.get('signature') != self.signature:
+            print("Pipeline steps or format changed since the last run, reprocessing all inputs")
+            return self.completed
+
+        for path, output_path in checkpoint.get('completed', {}).items():
+            if self.outputs.get(path) == output_path and Path(output_path).exists():
+                self.completed[path] = output_path
+        return self.completed
+
+    def save_checkpoint(self):
+        """Persist processed inputs so an interrupted run can resume"""
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'signature': self.signature, 'completed': self.completed}, fh, indent=2)
+        tmp_path.replace(self.checkpoint_path)
+
+    def pending_inputs(self):
+        """Inputs not yet recorded in the checkpoint"""
+        return [str(path) for path in self.pipeline['inputs'] if str(path) not in self.completed]
+
+    def run(self):
+        """Process all pending inputs on a worker pool"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        self.load_checkpoint()
+
+        pending = self.pending_inputs()
+        total = len(self.pipeline['inputs'])
+        done = total - len(pending)
+        if done:
+            print(f"Resuming: {done}/{total} inputs already processed")
+
+        steps = self.pipeline.get('steps', [])
+        start = time.time()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(process_file, path, steps, self.outputs[path], self.output_format): path
+                for path in pending
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                done += 1
+                try:
+                    output_path, n_features = future.result()
+                except Exception as e:
+                    self.failed[path] = str(e)
+                    print(f"[{done}/{total}] FAILED {path}: {e}")
+                    continue
+
+                self.completed[path] = output_path
+                self.save_checkpoint()
+                print(f"[{done}/{total}] {path} -> {output_path} ({n_features} features, {time.time() - start:.1f}s)")
+
+        return {'completed': self.completed, 'failed': self.failed}
+
+
+def main(argv=None):
+    """Command-line entry point for headless batch processing"""
+    parser = argparse.ArgumentParser(
+        prog='layered-earth-batch',
+        description="Run a Layered-Earth analysis pipeline without the GUI"
+    )
+    parser.add_argument('pipeline', help="Pipeline definition (.yaml, .yml or .json)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('-o', '--output-dir', default=None, help="Override the pipeline output directory")
+    parser.add_argument('-f', '--format', choices=list(OUTPUT_FORMATS), default=None, help="Override the output format")
+    parser.add_argument('--checkpoint', default=None, help="Checkpoint file used to resume interrupted runs")
+    parser.add_argument('--restart', action='store_true', help="Ignore any existing checkpoint")
+    args = parser.parse_args(argv)
+
+    try:
+        pipeline = load_pipeline(args.pipeline)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Invalid pipeline {args.pipeline}: {e}")
+        return 2
+
+    if args.output_dir:
+        pipeline['output_dir'] = args.output_dir
+    if args.format:
+        pipeline['format'] = args.format
+
+    runner = BatchRunner(pipeline, workers=args.workers, checkpoint_path=args.checkpoint)
+    if args.restart and runner.checkpoint_path.exists():
+        runner.checkpoint_path.unlink()
+
+    result = runner.run()
+    print(f"Done: {len(result['completed'])} processed, {len(result['failed'])} failed")
+    return 1 if result['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
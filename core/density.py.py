@@ -0,0 +1,226 @@
+import numpy as np
+
+WORLD_BOUNDS = (-180.0, -90.0, 180.0, 90.0)
+
+
+def zoom_level(span, world_width=360.0):
+    """Integer zoom level for a viewport span (0 shows the whole world)"""
+    if span <= 0:
+        return 0
+    return max(0, int(np.floor(np.log2(world_width / span))))
+
+
+def layer_world_bounds(points):
+    """WORLD_BOUNDS for a lon/lat layer, None for a projected one"""
+    if points.crs is not None:
+        from pyproj import CRS
+        return WORLD_BOUNDS if CRS.from_user_input(points.crs).is_geographic else None
+
+    # Without a CRS, only coordinates that fit in lon/lat ranges are taken as degrees
+    minx, miny, maxx, maxy = points.total_bounds
+    inside = minx >= -180 and maxx <= 180 and miny >= -90 and maxy <= 90
+    return WORLD_BOUNDS if inside else None
+
+
+def gaussian_smooth(grid, sigma):
+    """Smooth a 2-D grid with a separable Gaussian kernel"""
+    radius = max(1, int(3 * sigma))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    kernel /= kernel.sum()
+
+    padded = np.pad(grid, radius)
+    smoothed = np.apply_along_axis(np.convolve, 0, padded, kernel, mode='same')
+    smoothed = np.apply_along_axis(np.convolve, 1, smoothed, kernel, mode='same')
+    return smoothed[radius:-radius, radius:-radius]
+
+
+def hexagon(cell):
+    """Vertices of one hexagon of a hex grid with horizontal spacing cell"""
+    return np.array([[.5, -.5], [.5, .5], [0., 1.], [-.5, .5], [-.5, -.5], [0., -1.]]) * [cell, cell * np.sqrt(3) / 3]
+
+
+class DensityGrid:
+    """
+    Viewport density grid for a point layer, cached per zoom level.
+
+    Bin edges are snapped to a cell size that depends only on the zoom level,
+    so a cached grid can be reused while panning within its extent and points
+    appended to the layer can be added to it without re-binning the existing
+    ones. The cache does not hold on to the layer itself: call clear() when
+    the layer is replaced by a new version.
+
+    Modes are 'hist' (2-D histogram), 'kde' (Gaussian-smoothed histogram)
+    and 'hexbin' (hexagonal bins, two offset lattices like matplotlib's hexbin).
+
+    world_bounds limits the grid, WORLD_BOUNDS for lon/lat layers. With
+    world_bounds=None (projected layers) the layer's own extent is used.
+    """
+
+    def __init__(self, bins=256, mode='hist', sigma=1.5, world_bounds=WORLD_BOUNDS):
+        if mode not in ['hist', 'kde', 'hexbin']:
+            raise ValueError(f"Unknown density mode '{mode}', expected 'hist', 'kde' or 'hexbin'")
+        self.bins = bins
+        self.mode = mode
+        self.sigma = sigma
+        self.world_bounds = world_bounds
+        self.clear()
+
+    def _layer_bounds(self, points):
+        """Bounds the grid is clipped to"""
+        if self.world_bounds is not None:
+            return self.world_bounds
+
+        if self._bounds is not None and self._bounds_n < len(points):
+            # Appended points outside the current extent change the cell grid
+            x, y = points.x[self._bounds_n:], points.y[self._bounds_n:]
+            minx, miny, maxx, maxy = self._bounds
+            if x.min() < minx or x.max() > maxx or y.min() < miny or y.max() > maxy:
+                self.clear()
+            else:
+                self._bounds_n = len(points)
+
+        if self._bounds is None:
+            minx, miny, maxx, maxy = points.total_bounds if len(points) else (0.0, 0.0, 1.0, 1.0)
+            # Cells are half-open, so pad the extent to keep the outermost
+            # points inside it, also for a single point or a line of points
+            pad = max(maxx - minx, maxy - miny) * 0.01 or 0.5
+            self._bounds = (minx - pad, miny - pad, maxx + pad, maxy + pad)
+            self._bounds_n = len(points)
+        return self._bounds
+
+    def _clip_view(self, xlim, ylim, bounds):
+        """Viewport limited to the bounds, or None if it lies outside them"""
+        minx, miny, maxx, maxy = bounds
+        xlim = (max(min(xlim), minx), min(max(xlim), maxx))
+        ylim = (max(min(ylim), miny), min(max(ylim), maxy))
+        if xlim[0] >= xlim[1] or ylim[0] >= ylim[1]:
+            return None
+        return xlim, ylim
+
+    def _grid_extent(self, xlim, ylim, cell, bounds):
+        """
+        Viewport padded by half its size on each side, snapped to cell edges
+        and clipped to the bounds, with at most 2 x bins cells per axis
+        """
+        extent = []
+        for lo, hi, world_lo, world_hi in [(xlim[0], xlim[1], bounds[0], bounds[2]),
+                                           (ylim[0], ylim[1], bounds[1], bounds[3])]:
+            centre = (lo + hi) / 2
+            half = min(hi - lo, self.bins * cell)
+            start = max(np.floor((centre - half) / cell), np.floor(world_lo / cell))
+            stop = min(np.ceil((centre + half) / cell), np.ceil(world_hi / cell))
+            n_cells = int(min(max(stop - start, 1), 2 * self.bins))
+            extent.append((start * cell, (start + n_cells) * cell))
+        return [extent[0][0], extent[1][0], extent[0][1], extent[1][1]]
+
+    def _shape(self, extent, cell):
+        return (int(round((extent[2] - extent[0]) / cell)),
+                int(round((extent[3] - extent[1]) / cell)))
+
+    def _bin(self, x, y, extent, shape, cell):
+        """Count points per cell with a single vectorised bincount"""
+        ix = np.floor((x - extent[0]) / cell).astype(np.int64)
+        iy = np.floor((y - extent[1]) / cell).astype(np.int64)
+        inside = (ix >= 0) & (ix < shape[0]) & (iy >= 0) & (iy < shape[1])
+        flat = ix[inside] * shape[1] + iy[inside]
+        return np.bincount(flat, minlength=shape[0] * shape[1]).reshape(shape).astype(np.float64)
+
+    def _bin_hex(self, x, y, extent, shape, cell):
+        """Count points per hexagon on two offset lattices"""
+        sx, sy = cell, cell * np.sqrt(3)
+        ny = max(1, int(np.ceil(shape[1] / np.sqrt(3))))
+        fx = (x - extent[0]) / sx
+        fy = (y - extent[1]) / sy
+
+        ix1, iy1 = np.round(fx).astype(np.int64), np.round(fy).astype(np.int64)
+        ix2, iy2 = np.floor(fx).astype(np.int64), np.floor(fy).astype(np.int64)
+        d1 = (fx - ix1) ** 2 + 3.0 * (fy - iy1) ** 2
+        d2 = (fx - ix2 - .5) ** 2 + 3.0 * (fy - iy2 - .5) ** 2
+        first = d1 < d2
+
+        lattices = []
+        for ix, iy, n, m, mask in [(ix1, iy1, shape[0] + 1, ny + 1, first),
+                                   (ix2, iy2, shape[0], ny, ~first)]:
+            inside = mask & (ix >= 0) & (ix < n) & (iy >= 0) & (iy < m)
+            flat = ix[inside] * m + iy[inside]
+            lattices.append(np.bincount(flat, minlength=n * m).reshape(n, m).astype(np.float64))
+        return lattices
+
+    def _count(self, x, y, extent, cell):
+        shape = self._shape(extent, cell)
+        if self.mode == 'hexbin':
+            return self._bin_hex(x, y, extent, shape, cell)
+        return [self._bin(x, y, extent, shape, cell)]
+
+    def _covers(self, extent, xlim, ylim):
+        return (extent[0] <= xlim[0] and extent[1] <= ylim[0] and
+                extent[2] >= xlim[1] and extent[3] >= ylim[1])
+
+    def _render(self, counts, extent, cell):
+        if self.mode == 'hist':
+            return counts[0]
+        if self.mode == 'kde':
+            return gaussian_smooth(counts[0], self.sigma)
+
+        # Hex mode: centres and counts of the non-empty hexagons
+        centres, values = [], []
+        for lattice, offset in zip(counts, [0.0, 0.5]):
+            ix, iy = np.nonzero(lattice)
+            centres.append(np.column_stack([
+                extent[0] + (ix + offset) * cell,
+                extent[1] + (iy + offset) * cell * np.sqrt(3),
+            ]))
+            values.append(lattice[ix, iy])
+        return np.concatenate(centres), np.concatenate(values)
+
+    def compute(self, points, xlim, ylim):
+        """
+        Density for the current viewport.
+
+        Returns (grid, extent, cell). For 'hist' and 'kde' the grid is a 2-D
+        array indexed [x, y] covering extent [minx, miny, maxx, maxy]; for
+        'hexbin' it is (centres, counts) of the non-empty hexagons.
+        """
+        bounds = self._layer_bounds(points)
+        view = self._clip_view(xlim, ylim, bounds)
+        if view is None:
+            view = (tuple(bounds[0::2]), tuple(bounds[1::2]))
+        xlim, ylim = view
+
+        # Cells are fractions of the bounds' larger side: 360 degrees for
+        # lon/lat layers, the layer's own extent otherwise
+        world_width = max(bounds[2] - bounds[0], bounds[3] - bounds[1])
+        zoom = zoom_level(max(xlim[1] - xlim[0], ylim[1] - ylim[0]), world_width)
+        cell = world_width / (2 ** zoom) / self.bins
+        entry = self.cache.get(zoom)
+        n = len(points)
+
+        if entry is not None and entry['n_binned'] <= n and self._covers(entry['extent'], xlim, ylim):
+            if entry['n_binned'] < n:
+                # Only the points appended since the last call need binning
+                start = entry['n_binned']
+                added = self._count(points.x[start:], points.y[start:], entry['extent'], cell)
+                for counts, extra in zip(entry['counts'], added):
+                    counts += extra
+                entry['n_binned'] = n
+                entry['grid'] = None
+        else:
+            extent = self._grid_extent(xlim, ylim, cell, bounds)
+            entry = {
+                'extent': extent,
+                'counts': self._count(points.x, points.y, extent, cell),
+                'n_binned': n,
+                'grid': None,
+            }
+            self.cache[zoom] = entry
+
+        if entry['grid'] is None:
+            entry['grid'] = self._render(entry['counts'], entry['extent'], cell)
+        return entry['grid'], entry['extent'], cell
+
+    def clear(self):
+        """Drop all cached zoom levels"""
+        self.cache = {}
+        self._bounds = None
+        self._bounds_n = 0
@@ -2,13 +2,19 @@ import geopandas as gpd
 import pandas as pd
 from pathlib import Path
 
+from layered_earth.core.point_layer import PointLayer
+
 class LayerManager:
     def __init__(self):
         self.available_layers = {}
         self.symbology_settings = {}
     
-    def load_file(self, file_path, layer_name=None):
-        """Load various geospatial file formats"""
+    def load_file(self, file_path, layer_name=None, compact=False):
+        """Load various geospatial file formats
+        
+        With compact=True, CSV point files are returned as a PointLayer
+        instead of a GeoDataFrame.
+        """
         file_path = Path(file_path)
         
         if not layer_name:
@@ -30,7 +36,9 @@ class LayerManager:
                 lat_col = next((col for col in df.columns if 'lat' in col.lower()), None)
                 lon_col = next((col for col in df.columns if 'lon' in col.lower()), None)
                 
-                if lat_col and lon_col:
+                if lat_col and lon_col and compact:
+                    gdf = PointLayer.from_dataframe(df, lon_col, lat_col)
+                elif lat_col and lon_col:
                     gdf = gpd.GeoDataFrame(
                         df, 
                         geometry=gpd.points_from_xy(df[lon_col], df[lat_col])
@@ -1,14 +1,26 @@
 import geopandas as gpd
 import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
 from matplotlib.widgets import Cursor
 import numpy as np
 from shapely.geometry import Point
 
+from layered_earth.core.point_layer import PointLayer
+from layered_earth.core.density import DensityGrid, hexagon, layer_world_bounds
+
 class MapEngine:
-    def __init__(self):
+    def __init__(self, density_threshold=50000, density_mode='hist', density_bins=256):
         self.fig, self.ax = plt.subplots(figsize=(12, 8))
         self.layers = {}
         self.current_bounds = None
+        
+        # Point layers larger than density_threshold are drawn as a density
+        # surface ('hist', 'kde' or 'hexbin') instead of individual markers
+        self.density_threshold = density_threshold
+        self.density_mode = density_mode
+        self.density_bins = density_bins
+        self._updating_view = False
+        self._density_dirty = False
         self.setup_map()
     
     def setup_map(self):
@@ -19,6 +31,16 @@ class MapEngine:
         self.ax.grid(True, alpha=0.3)
         
         self.cursor = Cursor(self.ax, useblit=True, color='red', linewidth=1)
+        
+        # A pan or zoom changes x and y limits one after the other, so limit
+        # changes only mark density layers dirty and a single recompute runs
+        # once the view has settled
+        self.ax.callbacks.connect('xlim_changed', self._on_view_changed)
+        self.ax.callbacks.connect('ylim_changed', self._on_view_changed)
+        self._density_timer = self.fig.canvas.new_timer(interval=50)
+        self._density_timer.single_shot = True
+        self._density_timer.add_callback(self._flush_density)
+        self.fig.canvas.mpl_connect('draw_event', lambda event: self._flush_density())
         plt.ion()
     
     def add_vector_layer(self, gdf, layer_name, style=None):
@@ -30,13 +52,153 @@ class MapEngine:
         self.layers[layer_name] = {
             'type': 'vector',
             'data': gdf,
-            'style': style or {'color': 'blue', 'alpha': 0.5}
+            'style': style or {'color': 'blue', 'alpha': 0.5},
+            'artists': []
         }
         
-        gdf.plot(ax=self.ax, **self.layers[layer_name]['style'])
         self._update_bounds()
+        self._draw_layer(self.layers[layer_name], gdf)
+        self._refresh_map()
+    
+    def update_layer(self, layer_name, data):
+        """Replace the data of a layer with a new version and redraw it"""
+        layer = self.layers.get(layer_name)
+        if layer is None or data is layer['data']:
+            return
+        
+        if np.ndim(layer['style'].get('markersize', 0)):
+            print(f"Layer '{layer_name}': per-feature markersize was computed for the previous data, "
+                  "use a column name or a callable to size new data")
+            layer['style'] = {key: value for key, value in layer['style'].items() if key != 'markersize'}
+        
+        # A new version invalidates every cached density grid, and may be in
+        # another CRS, so a fresh grid is created when one is needed
+        layer['density'] = None
+        self._draw_layer(layer, data)
         self._refresh_map()
     
+    def append_points(self, layer_name, new_points):
+        """Append newly arrived feed points to a PointLayer and redraw it"""
+        layer = self.layers[layer_name]
+        
+        # Same layer object, so cached density grids only bin the new points
+        layer['data'].append(new_points)
+        self._draw_point_layer(layer, layer['data'])
+        self._refresh_map()
+    
+    def _use_density(self, gdf):
+        """Whether a layer is a point layer large enough for density rendering"""
+        if self.density_threshold is None or len(gdf) <= self.density_threshold:
+            return False
+        if isinstance(gdf, PointLayer):
+            return True
+        return bool((gdf.geom_type == 'Point').all())
+    
+    def _remove_artists(self, layer):
+        for artist in layer['artists']:
+            artist.remove()
+        layer['artists'] = []
+    
+    def _draw_layer(self, layer, data):
+        """Replace everything drawn for a layer with a drawing of data"""
+        if isinstance(data, PointLayer) or self._use_density(data):
+            self._draw_point_layer(layer, data)
+            return
+        
+        self._remove_artists(layer)
+        layer['data'] = data
+        layer['density'] = None
+        
+        # gdf.plot does not return its artists, so keep whatever it added
+        before = set(self.ax.get_children())
+        data.plot(ax=self.ax, **layer['style'])
+        layer['artists'] = [artist for artist in self.ax.get_children() if artist not in before]
+    
+    def _draw_point_layer(self, layer, points):
+        """Draw a point layer as markers or, above the threshold, as a density surface"""
+        if not isinstance(points, PointLayer):
+            points = PointLayer.from_geodataframe(points)
+        layer['data'] = points
+        self._remove_artists(layer)
+        
+        if self._use_density(points):
+            if layer.get('density') is None:
+                layer['density'] = DensityGrid(bins=self.density_bins, mode=self.density_mode,
+                                               world_bounds=layer_world_bounds(points))
+            self._draw_layer_density(layer)
+        else:
+            layer['density'] = None
+            layer['artists'] = [self._plot_point_layer(points, layer['style'])]
+    
+    def _draw_layer_density(self, layer):
+        """Draw the density surface of a layer for the current viewport"""
+        xlim = self.ax.get_xlim()
+        ylim = self.ax.get_ylim()
+        cmap = layer['style'].get('cmap', 'inferno')
+        alpha = layer['style'].get('alpha', 0.8)
+        grid, extent, cell = layer['density'].compute(layer['data'], xlim, ylim)
+        
+        self._remove_artists(layer)
+        
+        if layer['density'].mode == 'hexbin':
+            centres, counts = grid
+            artist = PolyCollection(centres[:, None, :] + hexagon(cell)[None, :, :],
+                                    array=np.log1p(counts), cmap=cmap, alpha=alpha,
+                                    edgecolors='face')
+            artist = self.ax.add_collection(artist, autolim=False)
+        else:
+            artist = self.ax.imshow(
+                np.ma.masked_equal(np.log1p(grid).T, 0),
+                extent=(extent[0], extent[2], extent[1], extent[3]),
+                origin='lower', aspect='auto', interpolation='nearest',
+                cmap=cmap, alpha=alpha
+            )
+        layer['artists'] = [artist]
+        
+        # imshow may autoscale the axes, put the viewport back without
+        # triggering another recompute
+        self._updating_view = True
+        try:
+            self.ax.set_xlim(xlim)
+            self.ax.set_ylim(ylim)
+        finally:
+            self._updating_view = False
+    
+    def _draw_density_layers(self):
+        for layer in self.layers.values():
+            if layer.get('density') is not None:
+                self._draw_layer_density(layer)
+    
+    def _on_view_changed(self, ax):
+        """Mark density surfaces for recomputation after a pan or zoom"""
+        if self._updating_view:
+            return
+        self._density_dirty = True
+        self._density_timer.start()
+    
+    def _flush_density(self):
+        """Recompute density surfaces once after the view has settled"""
+        if not self._density_dirty:
+            return
+        self._density_dirty = False
+        self._draw_density_layers()
+        self._refresh_map()
+    
+    def _plot_point_layer(self, points, style):
+        """Draw a PointLayer straight from its coordinate arrays"""
+        style = dict(style)
+        if 'markersize' in style:
+            # Sizes may be a column name or a callable, so they follow new data
+            size = style.pop('markersize')
+            if callable(size):
+                size = size(points)
+            elif isinstance(size, str):
+                size = points[size]
+            style['s'] = size
+        if 'edgecolor' in style:
+            style['edgecolors'] = style.pop('edgecolor')
+        return self.ax.scatter(points.x, points.y, **style)
+    
     def _update_bounds(self):
         """Update map bounds based on all layers"""
         all_bounds = []
@@ -51,9 +213,14 @@ class MapEngine:
                 all_bounds[:, 0].min(), all_bounds[:, 1].min(),
                 all_bounds[:, 2].max(), all_bounds[:, 3].max()
             ]
-            self.ax.set_xlim(total_bounds[0], total_bounds[2])
-            self.ax.set_ylim(total_bounds[1], total_bounds[3])
+            self._updating_view = True
+            try:
+                self.ax.set_xlim(total_bounds[0], total_bounds[2])
+                self.ax.set_ylim(total_bounds[1], total_bounds[3])
+            finally:
+                self._updating_view = False
             self.current_bounds = total_bounds
+            self._draw_density_layers()
     
     def _refresh_map(self):
         """Refresh the map display"""
@@ -66,6 +233,12 @@ class MapEngine:
         for layer_name, layer in self.layers.items():
             if layer['type'] == 'vector':
                 gdf = layer['data']
+                if isinstance(gdf, PointLayer):
+                    hits = gdf.within_distance(x, y, tolerance)
+                    if len(hits):
+                        popup_info[layer_name] = [gdf.row(idx) for idx in hits]
+                    continue
+                
                 for idx, row in gdf.iterrows():
                     if hasattr(row.geometry, 'contains'):
                         if row.geometry.contains(Point(x, y)):
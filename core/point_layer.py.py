@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+class PointLayer:
+    """
+    Compact point layer backed by contiguous float64 x/y arrays.
+
+    Attributes are kept as columns (one NumPy array each). Shapely geometries
+    are only created when to_geodataframe() is called, and the result is
+    cached until the layer changes.
+    """
+
+    def __init__(self, x, y, attributes=None, crs="EPSG:4326"):
+        self.x = np.ascontiguousarray(x, dtype=np.float64)
+        self.y = np.ascontiguousarray(y, dtype=np.float64)
+        if self.x.shape != self.y.shape or self.x.ndim != 1:
+            raise ValueError("x and y must be 1-D arrays of equal length")
+
+        self.attributes = {}
+        for name, values in (attributes or {}).items():
+            values = np.asarray(values)
+            if len(values) != len(self.x):
+                raise ValueError(f"Attribute '{name}' has {len(values)} values, expected {len(self.x)}")
+            self.attributes[name] = values
+
+        self.crs = crs
+        self._gdf = None
+
+    @classmethod
+    def from_geodataframe(cls, gdf):
+        """Build a point layer from a GeoDataFrame of Point geometries"""
+        if len(gdf) and not (gdf.geom_type == 'Point').all():
+            raise ValueError("PointLayer only supports Point geometries")
+
+        attributes = {
+            col: gdf[col].to_numpy()
+            for col in gdf.columns if col != gdf.geometry.name
+        }
+        return cls(gdf.geometry.x.to_numpy(), gdf.geometry.y.to_numpy(), attributes, crs=gdf.crs)
+
+    @classmethod
+    def from_dataframe(cls, df, x_col, y_col, crs="EPSG:4326"):
+        """Build a point layer from a DataFrame with coordinate columns"""
+        attributes = {col: df[col].to_numpy() for col in df.columns if col not in (x_col, y_col)}
+        return cls(df[x_col].to_numpy(), df[y_col].to_numpy(), attributes, crs=crs)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, name):
+        return self.attributes[name]
+
+    def __setitem__(self, name, values):
+        values = np.asarray(values)
+        if len(values) != len(self.x):
+            raise ValueError(f"Attribute '{name}' has {len(values)} values, expected {len(self.x)}")
+        self.attributes[name] = values
+        self._gdf = None
+
+    @property
+    def columns(self):
+        return list(self.attributes.keys())
+
+    @property
+    def total_bounds(self):
+        """Bounds as [minx, miny, maxx, maxy], matching GeoDataFrame.total_bounds"""
+        if not len(self):
+            return np.array([np.nan] * 4)
+        return np.array([self.x.min(), self.y.min(), self.x.max(), self.y.max()])
+
+    @property
+    def nbytes(self):
+        """Memory used by coordinates and attribute arrays"""
+        return self.x.nbytes + self.y.nbytes + sum(values.nbytes for values in self.attributes.values())
+
+    def row(self, idx):
+        """Attributes and coordinates of a single feature as a dict"""
+        record = {name: values[idx] for name, values in self.attributes.items()}
+        record['x'] = self.x[idx]
+        record['y'] = self.y[idx]
+        return record
+
+    def within_distance(self, x, y, distance):
+        """Indices of points within distance of (x, y)"""
+        dx = self.x - x
+        dy = self.y - y
+        return np.flatnonzero(dx * dx + dy * dy <= distance * distance)
+
+    def within_bounds(self, minx, miny, maxx, maxy):
+        """Boolean mask of points inside a bounding box"""
+        return (self.x >= minx) & (self.x <= maxx) & (self.y >= miny) & (self.y <= maxy)
+
+    def take(self, indices):
+        """New point layer containing only the selected features"""
+        return PointLayer(
+            self.x[indices], self.y[indices],
+            {name: values[indices] for name, values in self.attributes.items()},
+            crs=self.crs
+        )
+
+    def append(self, other):
+        """Append the features of another point layer in place"""
+        self.x = np.concatenate([self.x, other.x])
+        self.y = np.concatenate([self.y, other.y])
+        for name in self.attributes:
+            self.attributes[name] = np.concatenate([self.attributes[name], other.attributes[name]])
+        self._gdf = None
+
+    def to_dataframe(self):
+        """Attributes as a plain DataFrame (no geometries)"""
+        return pd.DataFrame(self.attributes)
+
+    def to_geodataframe(self):
+        """Convert to a GeoDataFrame, creating shapely geometries on first use"""
+        if self._gdf is None:
+            import geopandas as gpd
+            self._gdf = gpd.GeoDataFrame(
+                self.to_dataframe(),
+                geometry=gpd.points_from_xy(self.x, self.y),
+                crs=self.crs
+            )
+        return self._gdf
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Feed parsing in worker processes with shared-memory column handoff.
+
+A feed parser is a plain top-level function (so it can be pickled) that
+returns a dict of equal-length NumPy columns, including 'x' and 'y'. It runs
+in a worker process, each column is copied once into a
+multiprocessing.shared_memory block, and only the block names travel back to
+the GUI process. There the columns are mapped as NumPy arrays over the same
+memory, without copying, and wrapped in a PointLayer.
+"""
+
+import sys
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import requests
+
+from layered_earth.core.point_layer import PointLayer
+
+USGS_ALL_HOUR = 'https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_hour.geojson'
+
+
+def parse_earthquakes():
+    """Fetch and parse the USGS all-hour earthquake feed into columns"""
+    response = requests.get(USGS_ALL_HOUR, timeout=10)
+    response.raise_for_status()
+    features = response.json()['features']
+
+    return {
+        'x': np.array([feature['geometry']['coordinates'][0] for feature in features], dtype=np.float64),
+        'y': np.array([feature['geometry']['coordinates'][1] for feature in features], dtype=np.float64),
+        'magnitude': np.array([feature['properties']['mag'] for feature in features], dtype=np.float64),
+        'place': np.array([feature['properties']['place'] or '' for feature in features], dtype=str),
+        'time': np.array([feature['properties']['time'] for feature in features], dtype='datetime64[ms]'),
+    }
+
+
+def parse_weather_stations(n=20):
+    """Simulate weather station readings as columns"""
+    # Fresh OS entropy, forked workers would otherwise share the parent's seed
+    rng = np.random.default_rng()
+    return {
+        'x': rng.uniform(-180, 180, n),
+        'y': rng.uniform(-90, 90, n),
+        'station_id': np.array([f"ST{i:03d}" for i in range(n)], dtype=str),
+        'temperature': rng.uniform(-10, 35, n),
+        'humidity': rng.uniform(30, 100, n),
+    }
+
+
+def _create_block(size):
+    """
+    Create a shared memory block owned by the GUI process rather than this worker.
+
+    Without this, the worker's resource tracker would report the block as
+    leaked and unlink it while the GUI still maps it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+
+    block = shared_memory.SharedMemory(create=True, size=size)
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def _attach_block(name):
+    """
+    Attach to a block created by a worker (GUI side).
+
+    Before Python 3.13 attaching always registers the block with this
+    process's resource tracker, which unlink() balances, so the GUI process
+    is the one that cleans up if it dies.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def discard_blocks(descriptors):
+    """Unlink the blocks of a feed version that will never be swapped in"""
+    for _, block_name, _, _ in descriptors:
+        try:
+            block = _attach_block(block_name)
+        except FileNotFoundError:
+            continue
+        block.unlink()
+        block.close()
+
+
+def run_parser(parser):
+    """
+    Run a feed parser and export its columns to shared memory (worker side).
+
+    Returns a list of (column, block_name, dtype, shape) descriptors.
+    """
+    columns = parser()
+    if 'x' not in columns or 'y' not in columns:
+        raise ValueError(f"Feed parser {parser.__name__} must return 'x' and 'y' columns")
+
+    # Validate everything before any block exists, so bad output cannot leak memory
+    arrays = {}
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if values.ndim != 1:
+            raise ValueError(f"Feed parser {parser.__name__}: column '{name}' is not 1-D")
+        if values.dtype == object:
+            # Object arrays hold pointers into this process, so store them as fixed-width text
+            values = values.astype(str)
+        arrays[name] = values
+
+    lengths = {name: len(values) for name, values in arrays.items()}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(f"Feed parser {parser.__name__} returned columns of different lengths: {lengths}")
+
+    descriptors = []
+    try:
+        for name, values in arrays.items():
+            # Zero-length blocks are not allowed
+            block = _create_block(max(values.nbytes, 1))
+            descriptors.append((name, block.name, values.dtype.str, values.shape))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+            block.close()
+    except Exception:
+        discard_blocks(descriptors)
+        raise
+
+    return descriptors
+
+
+class SharedFeedData:
+    """Columns of one feed version, mapped from shared memory (GUI side)"""
+
+    def __init__(self, descriptors, crs="EPSG:4326"):
+        self.blocks = []
+        self._finalizers = []
+        try:
+            columns = {}
+            for name, block_name, dtype, shape in descriptors:
+                block = _attach_block(block_name)
+                self.blocks.append(block)
+                column = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+                # Closing a block unmaps it even while arrays still point into
+                # it, so each handle is closed only when its column array (and
+                # every view of it) has been garbage collected
+                self._finalizers.append(weakref.finalize(column, block.close))
+                columns[name] = column
+
+            self.layer = PointLayer(columns.pop('x'), columns.pop('y'), columns, crs=crs)
+        except Exception:
+            self.release()
+            discard_blocks(descriptors)
+            raise
+
+    @property
+    def closed(self):
+        """Whether every handle has been closed, i.e. no array maps this version any more"""
+        return not any(finalizer.alive for finalizer in self._finalizers)
+
+    def release(self):
+        """Unlink this version's blocks; each is unmapped once no array still uses it"""
+        for block in self.blocks:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
\ No newline at end of file
@@ -1,90 +1,170 @@
-import requests
-import pandas as pd
-import geopandas as gpd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+import multiprocessing
+import queue
 import time
 import threading
-import random
-from shapely.geometry import Point
+
+from layered_earth.core.point_layer import PointLayer
+from layered_earth.data.feed_workers import (
+    SharedFeedData, discard_blocks, run_parser, parse_earthquakes, parse_weather_stations
+)
 
 class RealTimeData:
-    def __init__(self):
+    def __init__(self, max_workers=2):
         self.active_feeds = {}
         self.update_callbacks = []
+        self.feed_parsers = {
+            'earthquake': {'parser': parse_earthquakes, 'update_interval': 60,
+                           'fallback': self._create_sample_earthquakes},
+            'weather': {'parser': parse_weather_stations, 'update_interval': 300},
+        }
+        
+        # Fetching and parsing run in worker processes. Finished versions are
+        # queued and only mapped and swapped in by process_pending(), which
+        # the GUI calls from its own thread
+        self.max_workers = max_workers
+        self._executor = None
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._pending = set()
+        self._closing = False
     
-    def add_earthquake_feed(self, layer_name="Earthquakes"):
-        """Add real-time earthquake data from USGS"""
-        try:
-            response = requests.get('https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_hour.geojson', timeout=10)
-            data = response.json()
-            
-            features = []
-            for feature in data['features']:
-                props = feature['properties']
-                geom = feature['geometry']
-                
-                features.append({
-                    'magnitude': props['mag'],
-                    'place': props['place'],
-                    'time': datetime.fromtimestamp(props['time'] / 1000),
-                    'geometry': Point(geom['coordinates'][0], geom['coordinates'][1])
-                })
+    def register_feed_parser(self, feed_type, parser, update_interval=60):
+        """
+        Register a parser for a custom feed type.
+        
+        The parser must be a top-level function (it is pickled to a worker
+        process) returning a dict of equal-length NumPy columns with 'x'
+        and 'y' coordinates.
+        """
+        self.feed_parsers[feed_type] = {'parser': parser, 'update_interval': update_interval}
+    
+    def _get_executor(self):
+        if self._executor is None:
+            # Forking a process that runs a GUI event loop and threads is
+            # unsafe, so workers start from a clean interpreter
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context(method))
+        return self._executor
+    
+    def _submit(self, layer_name, feed_type):
+        """Start fetching a feed version in a worker process"""
+        with self._lock:
+            if self._closing or layer_name in self._pending:
+                return
+            self._pending.add(layer_name)
+            future = self._get_executor().submit(run_parser, self.feed_parsers[feed_type]['parser'])
+            self._in_flight.add(future)
+        
+        def on_done(future):
+            # Runs on the executor's thread, so it only hands the result over
+            with self._lock:
+                self._in_flight.discard(future)
+                closing = self._closing
+            if future.cancelled():
+                return
+            if closing:
+                if future.exception() is None:
+                    discard_blocks(future.result())
+                return
+            self._results.put((layer_name, feed_type, future))
+        
+        future.add_done_callback(on_done)
+    
+    def add_feed(self, layer_name, feed_type):
+        """Fetch a feed in a worker process, process_pending() adds it as a layer"""
+        self._submit(layer_name, feed_type)
+    
+    def refresh_feed(self, layer_name):
+        """Re-fetch a feed in the background, process_pending() swaps it in"""
+        self._submit(layer_name, self.active_feeds[layer_name]['type'])
+    
+    def process_pending(self):
+        """Swap in finished feed versions and notify callbacks (GUI thread)"""
+        while True:
+            try:
+                layer_name, feed_type, future = self._results.get_nowait()
+            except queue.Empty:
+                return
             
-            gdf = gpd.GeoDataFrame(features, crs="EPSG:4326")
+            with self._lock:
+                self._pending.discard(layer_name)
+            try:
+                self._swap_feed_data(layer_name, feed_type, future.result())
+            except Exception as e:
+                print(f"Error fetching {layer_name}: {e}")
+                if not self._use_fallback(layer_name, feed_type):
+                    continue
+            self.simulate_data_update(layer_name)
+    
+    def _use_fallback(self, layer_name, feed_type):
+        """Keep the current version of a failed feed, or add its fallback data"""
+        if layer_name in self.active_feeds:
+            self.active_feeds[layer_name]['last_update'] = datetime.now()
+            return False
+        
+        fallback = self.feed_parsers[feed_type].get('fallback')
+        if fallback is None:
+            return False
+        self.active_feeds[layer_name] = {
+            'type': feed_type,
+            'data': fallback(),
+            'shared': None,
+            'update_interval': self.feed_parsers[feed_type]['update_interval'],
+            'last_update': datetime.now()
+        }
+        return True
+    
+    def _swap_feed_data(self, layer_name, feed_type, descriptors):
+        """Map a new feed version from shared memory and replace the old one"""
+        shared = SharedFeedData(descriptors)
+        
+        with self._lock:
+            old = self.active_feeds.get(layer_name)
             self.active_feeds[layer_name] = {
-                'type': 'earthquake',
-                'data': gdf,
-                'update_interval': 60,
+                'type': feed_type,
+                'data': shared.layer,
+                'shared': shared,
+                'update_interval': self.feed_parsers[feed_type]['update_interval'],
                 'last_update': datetime.now()
             }
-            return gdf
-            
-        except Exception as e:
-            print(f"Error fetching earthquake data: {e}")
-            return self._create_sample_earthquakes()
+        
+        if old is not None and old.get('shared') is not None:
+            old['shared'].release()
+    
+    def add_earthquake_feed(self, layer_name="Earthquakes"):
+        """Add real-time earthquake data from USGS, or sample data if the fetch fails"""
+        self.add_feed(layer_name, 'earthquake')
     
     def _create_sample_earthquakes(self):
         """Create sample earthquake data for demo"""
-        features = []
-        for i in range(10):
-            features.append({
-                'magnitude': random.uniform(1.0, 5.0),
-                'place': f"Sample Location {i}",
-                'time': datetime.now(),
-                'geometry': Point(random.uniform(-180, 180), random.uniform(-90, 90))
-            })
-        
-        return gpd.GeoDataFrame(features, crs="EPSG:4326")
+        n = 10
+        return PointLayer(
+            np.random.uniform(-180, 180, n),
+            np.random.uniform(-90, 90, n),
+            {
+                'magnitude': np.random.uniform(1.0, 5.0, n),
+                'place': np.array([f"Sample Location {i}" for i in range(n)], dtype=object),
+                'time': np.full(n, np.datetime64(datetime.now(), 'ms')),
+            },
+            crs="EPSG:4326"
+        )
     
     def add_weather_stations(self, layer_name="Weather Stations"):
         """Add simulated weather station data"""
-        stations = []
-        for i in range(20):
-            stations.append({
-                'station_id': f"ST{i:03d}",
-                'temperature': random.uniform(-10, 35),
-                'humidity': random.uniform(30, 100),
-                'geometry': Point(random.uniform(-180, 180), random.uniform(-90, 90))
-            })
-        
-        gdf = gpd.GeoDataFrame(stations, crs="EPSG:4326")
-        self.active_feeds[layer_name] = {
-            'type': 'weather',
-            'data': gdf,
-            'update_interval': 300,
-            'last_update': datetime.now()
-        }
-        return gdf
+        self.add_feed(layer_name, 'weather')
     
     def start_real_time_updates(self):
         """Start background thread for real-time data updates"""
         def update_loop():
             while True:
-                for layer_name, feed in self.active_feeds.items():
+                for layer_name, feed in list(self.active_feeds.items()):
                     if (datetime.now() - feed['last_update']).seconds > feed['update_interval']:
-                        if feed['type'] == 'earthquake':
-                            self.add_earthquake_feed(layer_name)
-                        self.simulate_data_update(layer_name)
+                        self.refresh_feed(layer_name)
                 
                 time.sleep(30)
         
@@ -101,4 +181,29 @@ class RealTimeData:
     
     def register_update_callback(self, callback):
         """Register callback for real-time updates"""
-        self.update_callbacks.append(callback)
\ No newline at end of file
+        self.update_callbacks.append(callback)
+    
+    def shutdown(self):
+        """Stop worker processes and unlink shared feed memory (safe to call twice)"""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            in_flight = list(self._in_flight)
+        for future in in_flight:
+            future.cancel()
+        
+        # Fetches already running finish and their blocks are discarded
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        
+        # Versions queued but never swapped in
+        while not self._results.empty():
+            _, _, future = self._results.get_nowait()
+            if future.exception() is None:
+                discard_blocks(future.result())
+        
+        for feed in self.active_feeds.values():
+            if feed.get('shared') is not None:
+                feed['shared'].release()
\ No newline at end of file
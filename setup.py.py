@@ -34,9 +34,13 @@ setup(
         "requests>=2.25.0",
         "plotly>=5.0.0",
     ],
+    extras_require={
+        "batch": ["pyyaml>=5.4", "pyarrow>=8.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "layered-earth=layered_earth:launch",
+            "layered-earth-batch=layered_earth.batch.runner:main",
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1 @@
+# Tests for Layered-Earth
\ No newline at end of file
@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from layered_earth.batch.runner import BatchRunner, load_pipeline, main, output_paths
+
+
+def write_pipeline(tmp_path, pipeline):
+    path = tmp_path / 'pipeline.json'
+    path.write_text(json.dumps(pipeline))
+    return path
+
+
+def write_points_csv(path, n):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({
+        'name': [f"P{i}" for i in range(n)],
+        'lat': [37.5 + i * 0.01 for i in range(n)],
+        'lon': [-122.5 + i * 0.01 for i in range(n)],
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_load_pipeline_validation(tmp_path):
+    path = write_pipeline(tmp_path, {'inputs': ['a.csv'], 'steps': [{'tool': 'buffer', 'distance': 1}]})
+    assert load_pipeline(path)['steps'][0]['tool'] == 'buffer'
+
+    with pytest.raises(ValueError, match="no inputs"):
+        load_pipeline(write_pipeline(tmp_path, {'inputs': []}))
+    with pytest.raises(ValueError, match="Unknown tool"):
+        load_pipeline(write_pipeline(tmp_path, {'inputs': ['a.csv'], 'steps': [{'tool': 'warp'}]}))
+    with pytest.raises(ValueError, match="Unknown output format"):
+        load_pipeline(write_pipeline(tmp_path, {'inputs': ['a.csv'], 'format': 'shp'}))
+    with pytest.raises(ValueError, match="more than once"):
+        load_pipeline(write_pipeline(tmp_path, {'inputs': ['a.csv', './a.csv']}))
+
+
+def test_output_paths_are_unique(tmp_path):
+    inputs = [str(tmp_path / 'a' / 'pts.csv'), str(tmp_path / 'b' / 'pts.csv'), str(tmp_path / 'a' / 'pts.geojson')]
+    paths = output_paths(inputs, tmp_path / 'out', 'parquet')
+    assert len(set(paths.values())) == 3
+    assert paths[inputs[0]] == str(tmp_path / 'out' / 'a' / 'pts_csv.parquet')
+
+
+def test_run_and_resume(tmp_path):
+    inputs = [str(write_points_csv(tmp_path / 'a' / 'pts.csv', 3)),
+              str(write_points_csv(tmp_path / 'b' / 'pts.csv', 5))]
+    pipeline = {'inputs': inputs, 'output_dir': str(tmp_path / 'out'), 'workers': 2}
+
+    result = BatchRunner(pipeline).run()
+    assert not result['failed']
+    counts = sorted(len(pd.read_parquet(path)) for path in result['completed'].values())
+    assert counts == [3, 5]
+
+    # Unchanged pipeline: everything is resumed from the checkpoint
+    runner = BatchRunner(pipeline)
+    runner.load_checkpoint()
+    assert runner.pending_inputs() == []
+
+
+def test_checkpoint_invalidated_by_changed_steps_or_missing_output(tmp_path):
+    inputs = [str(write_points_csv(tmp_path / 'pts.csv', 2))]
+    pipeline = {'inputs': inputs, 'output_dir': str(tmp_path / 'out')}
+    result = BatchRunner(pipeline).run()
+
+    changed = dict(pipeline, steps=[{'tool': 'buffer', 'distance': 0.1}])
+    runner = BatchRunner(changed)
+    runner.load_checkpoint()
+    assert runner.pending_inputs() == inputs
+
+    for output_path in result['completed'].values():
+        Path(output_path).unlink()
+    runner = BatchRunner(pipeline)
+    runner.load_checkpoint()
+    assert runner.pending_inputs() == inputs
+
+
+def test_main_creates_checkpoint_directory(tmp_path):
+    inputs = [str(write_points_csv(tmp_path / 'pts.csv', 2))]
+    pipeline = write_pipeline(tmp_path, {'inputs': inputs, 'output_dir': str(tmp_path / 'out')})
+    checkpoint = tmp_path / 'ck' / 'state.json'
+
+    assert main([str(pipeline), '--checkpoint', str(checkpoint)]) == 0
+    assert checkpoint.exists()
+
+
+def test_main_reports_invalid_pipeline(tmp_path, capsys):
+    pipeline = write_pipeline(tmp_path, {'inputs': ['a.csv'], 'steps': [{'tool': 'warp'}]})
+    assert main([str(pipeline)]) != 0
+    assert "Unknown tool" in capsys.readouterr().out
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from layered_earth.core.density import DensityGrid, zoom_level
+from layered_earth.core.point_layer import PointLayer
+
+
+def world_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return PointLayer(rng.uniform(-180, 180, n), rng.uniform(-90, 90, n))
+
+
+def total(grid, mode):
+    return grid[1].sum() if mode == 'hexbin' else grid.sum()
+
+
+def test_zoom_level():
+    assert zoom_level(360) == 0
+    assert zoom_level(36000) == 0
+    assert zoom_level(45) == 3
+
+
+@pytest.mark.parametrize('xlim, ylim', [
+    ((0, 0.1), (-80, 80)),              # narrow and tall, e.g. mid box-zoom
+    ((-18000, 18000), (-9000, 9000)),   # zoomed far out
+    ((500, 600), (500, 600)),           # entirely outside the world
+    ((10, 10.001), (10, 10.001)),       # deep zoom
+])
+def test_grid_size_is_bounded(xlim, ylim):
+    grid = DensityGrid(bins=64)
+    counts, extent, cell = grid.compute(world_points(1000), xlim, ylim)
+    assert counts.shape[0] <= 128 and counts.shape[1] <= 128
+    assert extent[0] >= -180 and extent[1] >= -90 and extent[2] <= 180 and extent[3] <= 90
+
+
+@pytest.mark.parametrize('mode', ['hist', 'hexbin'])
+def test_world_view_counts_every_point(mode):
+    grid, _, _ = DensityGrid(bins=64, mode=mode).compute(world_points(5000), (-180, 180), (-90, 90))
+    assert total(grid, mode) == 5000
+
+
+@pytest.mark.parametrize('mode', ['hist', 'hexbin'])
+def test_appended_points_are_binned_incrementally(mode):
+    points = world_points(1000)
+    density = DensityGrid(bins=64, mode=mode)
+    density.compute(points, (-180, 180), (-90, 90))
+
+    points.append(world_points(500, seed=1))
+    grid, _, _ = density.compute(points, (-180, 180), (-90, 90))
+    fresh, _, _ = DensityGrid(bins=64, mode=mode).compute(points, (-180, 180), (-90, 90))
+
+    assert total(grid, mode) == 1500
+    if mode == 'hist':
+        np.testing.assert_array_equal(grid, fresh)
+
+
+@pytest.mark.parametrize('mode', ['hist', 'hexbin'])
+def test_projected_points_use_layer_extent(mode):
+    rng = np.random.default_rng(2)
+    points = PointLayer(rng.uniform(4e5, 9e5, 2000), rng.uniform(5e6, 5.3e6, 2000), crs="EPSG:32633")
+    density = DensityGrid(bins=64, mode=mode, world_bounds=None)
+    grid, _, _ = density.compute(points, (4e5, 9e5), (5e6, 5.3e6))
+    assert total(grid, mode) == 2000
+
+    # Points beyond the first extent grow it rather than being dropped
+    points.append(PointLayer([2e6], [6e6], crs="EPSG:32633"))
+    grid, _, _ = density.compute(points, (0, 3e6), (4e6, 7e6))
+    assert total(grid, mode) == 2001
+
+
+def test_cache_reused_while_panning_and_dropped_on_clear():
+    points = world_points(1000)
+    density = DensityGrid(bins=64)
+    first = density.compute(points, (0, 10), (0, 10))
+    assert density.compute(points, (1, 11), (1, 11))[0] is first[0]
+    assert not any('layer' in entry for entry in density.cache.values())
+
+    density.clear()
+    assert density.compute(points, (1, 11), (1, 11))[0] is not first[0]
+
+
+def test_kde_keeps_grid_shape():
+    grid = DensityGrid(bins=8, mode='kde')
+    counts, _, _ = grid.compute(world_points(100), (-180, 180), (-90, 90))
+    hist, _, _ = DensityGrid(bins=8).compute(world_points(100), (-180, 180), (-90, 90))
+    assert counts.shape == hist.shape
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        DensityGrid(mode='contour')
@@ -0,0 +1,117 @@
+import gc
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from layered_earth.data.feed_workers import SharedFeedData, discard_blocks, run_parser
+
+pytestmark = pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason="needs /dev/shm to inspect blocks")
+
+
+def shm_exists(descriptors):
+    return [os.path.exists(os.path.join('/dev/shm', block_name)) for _, block_name, _, _ in descriptors]
+
+
+def buoy_parser():
+    return {
+        'x': np.array([1.0, 2.0, 3.0]),
+        'y': np.array([4.0, 5.0, 6.0]),
+        'name': np.array(['a', 'bb', None], dtype=object),
+        'height': np.array([0.5, 1.5, 2.5]),
+    }
+
+
+def ragged_parser():
+    return {'x': np.array([1.0, 2.0]), 'y': np.array([1.0])}
+
+
+def empty_parser():
+    return {'x': np.array([]), 'y': np.array([])}
+
+
+def test_round_trip_maps_columns_without_copy_and_release_unlinks():
+    descriptors = run_parser(buoy_parser)
+    shared = SharedFeedData(descriptors)
+    layer = shared.layer
+
+    np.testing.assert_array_equal(layer.x, [1.0, 2.0, 3.0])
+    assert list(layer['name']) == ['a', 'bb', 'None']
+    assert layer.x.base is not None and not layer.x.flags.owndata
+    assert all(shm_exists(descriptors))
+
+    # Unlinked right away, unmapped only once the layer's arrays are gone
+    shared.release()
+    assert not any(shm_exists(descriptors))
+    assert not shared.closed
+    np.testing.assert_array_equal(layer['height'], [0.5, 1.5, 2.5])
+
+    del layer
+    shared.layer = None
+    gc.collect()
+    assert shared.closed
+
+
+def test_empty_feed():
+    shared = SharedFeedData(run_parser(empty_parser))
+    assert len(shared.layer) == 0
+    shared.release()
+
+
+def test_ragged_columns_rejected_before_blocks_exist():
+    before = set(os.listdir('/dev/shm'))
+    with pytest.raises(ValueError, match="different lengths"):
+        run_parser(ragged_parser)
+    assert set(os.listdir('/dev/shm')) == before
+
+
+def test_failed_attach_releases_blocks():
+    descriptors = run_parser(buoy_parser)
+    # Corrupt the y descriptor so PointLayer construction fails
+    name, block_name, dtype, _ = descriptors[1]
+    descriptors[1] = (name, block_name, dtype, (2,))
+
+    with pytest.raises(ValueError):
+        SharedFeedData(descriptors)
+    assert not any(shm_exists(descriptors))
+
+
+def test_discard_blocks_is_idempotent():
+    descriptors = run_parser(buoy_parser)
+    discard_blocks(descriptors)
+    discard_blocks(descriptors)
+    assert not any(shm_exists(descriptors))
+
+
+def test_worker_processes_leave_no_leaked_blocks():
+    script = (
+        "import threading, time\n"
+        "from layered_earth.data.real_time import RealTimeData\n"
+        "feeds = RealTimeData(max_workers=2)\n"
+        "updates = []\n"
+        "feeds.register_update_callback(lambda name, layer: updates.append((threading.current_thread(), layer)))\n"
+        "def wait_for(n):\n"
+        "    deadline = time.time() + 30\n"
+        "    while len(updates) < n and time.time() < deadline:\n"
+        "        feeds.process_pending()\n"
+        "        time.sleep(0.05)\n"
+        "    assert len(updates) == n\n"
+        "feeds.add_weather_stations('Weather')\n"
+        "assert not updates\n"
+        "wait_for(1)\n"
+        "feeds.refresh_feed('Weather')\n"
+        "wait_for(2)\n"
+        "assert all(thread is threading.main_thread() and len(layer) == 20 for thread, layer in updates)\n"
+        "feeds.refresh_feed('Weather')\n"
+        "feeds.shutdown()\n"
+        "feeds.shutdown()\n"
+    )
+    before = set(os.listdir('/dev/shm'))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, env=env, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert 'leaked' not in result.stderr
+    assert 'Traceback' not in result.stderr
+    assert set(os.listdir('/dev/shm')) <= before
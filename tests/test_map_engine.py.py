@@ -0,0 +1,86 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+import numpy as np
+import pytest
+
+from layered_earth.core import density
+from layered_earth.core.map_engine import MapEngine
+from layered_earth.core.point_layer import PointLayer
+
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return PointLayer(rng.uniform(-180, 180, n), rng.uniform(-90, 90, n), {'mag': rng.uniform(1, 5, n)})
+
+
+@pytest.fixture
+def engine():
+    engine = MapEngine(density_threshold=100, density_bins=32)
+    yield engine
+    plt.close(engine.fig)
+
+
+def test_density_computed_once_per_add_and_per_view_change(engine, monkeypatch):
+    calls = []
+    compute = density.DensityGrid.compute
+    monkeypatch.setattr(density.DensityGrid, 'compute', lambda self, *args: calls.append(args) or compute(self, *args))
+
+    engine.add_vector_layer(random_points(1000), 'quakes')
+    assert len(calls) == 1
+
+    engine.ax.set_xlim(0, 10)
+    engine.ax.set_ylim(0, 10)
+    engine._flush_density()
+    assert len(calls) == 2
+    assert calls[-1][1:] == ((0, 10), (0, 10))
+
+
+def test_update_switches_between_markers_and_density(engine):
+    engine.add_vector_layer(random_points(50), 'quakes')
+    assert engine.layers['quakes']['density'] is None
+
+    engine.update_layer('quakes', random_points(5000, seed=1))
+    assert engine.layers['quakes']['density'] is not None
+
+    engine.update_layer('quakes', random_points(20, seed=2))
+    assert engine.layers['quakes']['density'] is None
+
+
+def test_markersize_follows_new_data(engine):
+    engine.add_vector_layer(random_points(50), 'quakes', {'markersize': lambda points: points['mag'] * 20})
+    new = random_points(50, seed=3)
+    engine.update_layer('quakes', new)
+    np.testing.assert_allclose(engine.layers['quakes']['artists'][0].get_sizes(), new['mag'] * 20)
+
+
+def test_hexbin_mode(engine):
+    engine.density_mode = 'hexbin'
+    engine.add_vector_layer(random_points(1000), 'quakes')
+    artist, = engine.layers['quakes']['artists']
+    assert artist.get_array().size > 0
+
+
+def test_plotted_geodataframe_is_replaced_on_update(engine):
+    small = random_points(50).to_geodataframe()
+    engine.add_vector_layer(small, 'quakes')
+    old = engine.layers['quakes']['artists']
+    assert old
+
+    engine.update_layer('quakes', random_points(30, seed=4).to_geodataframe())
+    assert all(artist not in engine.ax.get_children() for artist in old)
+    assert len(engine.layers['quakes']['artists'][0].get_offsets()) == 30
+
+    engine.update_layer('quakes', random_points(5000, seed=5).to_geodataframe())
+    assert engine.layers['quakes']['density'] is not None
+    assert len(engine.ax.collections) == 0
+    assert len(engine.ax.images) == 1
+
+
+def test_projected_layer_density_is_not_empty(engine):
+    rng = np.random.default_rng(6)
+    points = PointLayer(rng.uniform(-2e6, 2e6, 1000), rng.uniform(4e6, 6e6, 1000), crs="EPSG:3857")
+    engine.add_vector_layer(points, 'projected')
+    image, = engine.layers['projected']['artists']
+    assert np.expm1(image.get_array()).sum() == pytest.approx(1000)
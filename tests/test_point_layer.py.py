@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+from layered_earth.core.point_layer import PointLayer
+from layered_earth.analysis.vector_tools import VectorAnalysis
+
+
+def make_layer():
+    return PointLayer([0.0, 1.0, 2.0], [0.0, 1.0, 2.0], {'mag': [1.5, 2.5, 3.5]})
+
+
+def test_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        PointLayer([0.0, 1.0], [0.0])
+    with pytest.raises(ValueError):
+        PointLayer([0.0, 1.0], [0.0, 1.0], {'mag': [1.0]})
+
+
+def test_from_dataframe_keeps_coordinates_out_of_attributes():
+    df = pd.DataFrame({'name': ['a', 'b'], 'lat': [10.0, 20.0], 'lon': [1.0, 2.0]})
+    layer = PointLayer.from_dataframe(df, 'lon', 'lat')
+    assert layer.columns == ['name']
+    np.testing.assert_array_equal(layer.x, [1.0, 2.0])
+    np.testing.assert_array_equal(layer.y, [10.0, 20.0])
+
+
+def test_geodataframe_round_trip():
+    layer = make_layer()
+    gdf = layer.to_geodataframe()
+    assert gdf is layer.to_geodataframe()
+
+    back = PointLayer.from_geodataframe(gdf)
+    np.testing.assert_array_equal(back.x, layer.x)
+    np.testing.assert_array_equal(back['mag'], layer['mag'])
+    np.testing.assert_array_equal(layer.total_bounds, [0.0, 0.0, 2.0, 2.0])
+
+
+def test_selection_and_append():
+    layer = make_layer()
+    np.testing.assert_array_equal(layer.within_distance(1.0, 1.0, 0.5), [1])
+    assert len(layer.take(layer.within_bounds(0.5, 0.5, 2.5, 2.5))) == 2
+
+    gdf = layer.to_geodataframe()
+    layer.append(PointLayer([5.0], [5.0], {'mag': [9.0]}))
+    assert len(layer) == 4
+    assert len(layer.to_geodataframe()) == 4 and layer.to_geodataframe() is not gdf
+
+
+def test_proximity_returns_geodataframe_for_both_inputs():
+    tools = VectorAnalysis()
+    layer = make_layer()
+    compact = tools.proximity_analysis(layer, 0.0, 0.0, 1.5)
+    full = tools.proximity_analysis(layer.to_geodataframe(), 0.0, 0.0, 1.5)
+    assert isinstance(compact, gpd.GeoDataFrame) and isinstance(full, gpd.GeoDataFrame)
+    assert list(compact['mag']) == list(full['mag']) == [1.5, 2.5]
+
+
+MEMORY_SCRIPT = """
+import os
+import geopandas as gpd
+import numpy as np
+from layered_earth.core.point_layer import PointLayer
+
+def rss():
+    return int(open('/proc/self/statm').read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+n = 200000
+rng = np.random.default_rng(0)
+x, y, mag = rng.uniform(-180, 180, n), rng.uniform(-90, 90, n), rng.uniform(0, 9, n)
+
+before = rss()
+gdf = gpd.GeoDataFrame({'mag': mag}, geometry=gpd.points_from_xy(x, y))
+print(rss() - before, PointLayer(x, y, {'mag': mag}).nbytes)
+"""
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/statm'), reason="needs /proc to read resident memory")
+def test_memory_at_least_five_times_smaller_than_geodataframe():
+    # Shapely geometries live in GEOS memory, which GeoDataFrame.memory_usage
+    # does not see, so the GeoDataFrame cost is taken from resident memory
+    # growth, measured in a fresh interpreter so no freed heap is reused
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, '-c', MEMORY_SCRIPT], capture_output=True, text=True, env=env, timeout=120)
+    assert result.returncode == 0, result.stderr
+
+    gdf_bytes, layer_bytes = map(int, result.stdout.split())
+    assert gdf_bytes >= 5 * layer_bytes
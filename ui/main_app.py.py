@@ -1,3 +1,4 @@
+import atexit
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button, TextBox
 import threading
@@ -13,16 +14,18 @@ from layered_earth.data.real_time import RealTimeData
 from layered_earth.demo.sample_data import SampleDataGenerator
 
 class LayeredEarthApp:
-    def __init__(self):
-        self.map_engine = MapEngine()
+    def __init__(self, density_threshold=50000, density_mode='hist'):
+        self.map_engine = MapEngine(density_threshold=density_threshold, density_mode=density_mode)
         self.layer_manager = LayerManager()
         self.vector_tools = VectorAnalysis()
         self.ai_agent = GeospatialAIAgent()
         self.real_time_data = RealTimeData()
         self.dashboard = None
         self.dashboard_visible = False
+        self.feed_styles = {}
         
         self.real_time_data.register_update_callback(self.on_real_time_update)
+        atexit.register(self.real_time_data.shutdown)
         self.setup_ui()
         self.load_sample_data()
         self.real_time_data.start_real_time_updates()
@@ -32,6 +35,12 @@ class LayeredEarthApp:
         self.map_engine.ax.set_position([0.3, 0.1, 0.65, 0.85])
         self.create_control_panels()
         self.map_engine.fig.canvas.mpl_connect('button_press_event', self.on_click)
+        self.map_engine.fig.canvas.mpl_connect('close_event', self.on_close)
+        
+        # Feeds fetched in worker processes are swapped in on the GUI thread
+        self.feed_timer = self.map_engine.fig.canvas.new_timer(interval=250)
+        self.feed_timer.add_callback(self.real_time_data.process_pending)
+        self.feed_timer.start()
     
     def create_control_panels(self):
         """Create all control panels"""
@@ -93,41 +102,43 @@ class LayeredEarthApp:
     
     def add_earthquake_data(self, event):
         """Add real-time earthquake data"""
-        gdf = self.real_time_data.add_earthquake_feed("Earthquakes")
-        if gdf is not None:
-            style = {
-                'color': 'red',
-                'markersize': gdf['magnitude'] * 20,
-                'alpha': 0.7
-            }
-            self.map_engine.add_vector_layer(gdf, "Earthquakes", style)
-            self.layer_manager.available_layers["Earthquakes"] = {
-                'type': 'vector', 
-                'data': gdf
-            }
-            print("Earthquake data added!")
+        self.feed_styles["Earthquakes"] = {
+            'color': 'red',
+            'markersize': lambda points: points['magnitude'] * 20,
+            'alpha': 0.7
+        }
+        self.real_time_data.add_earthquake_feed("Earthquakes")
+        print("Fetching earthquake data...")
     
     def add_weather_data(self, event):
         """Add simulated weather data"""
-        gdf = self.real_time_data.add_weather_stations("Weather Stations")
-        if gdf is not None:
-            style = {
-                'color': 'blue',
-                'markersize': 50,
-                'alpha': 0.6
-            }
-            self.map_engine.add_vector_layer(gdf, "Weather Stations", style)
-            self.layer_manager.available_layers["Weather Stations"] = {
-                'type': 'vector', 
-                'data': gdf
-            }
-            print("Weather station data added!")
+        self.feed_styles["Weather Stations"] = {
+            'color': 'blue',
+            'markersize': 50,
+            'alpha': 0.6
+        }
+        self.real_time_data.add_weather_stations("Weather Stations")
+        print("Fetching weather station data...")
     
     def on_real_time_update(self, layer_name, new_data):
         """Handle real-time data updates"""
         if layer_name in self.layer_manager.available_layers:
             self.layer_manager.available_layers[layer_name]['data'] = new_data
+            self.map_engine.update_layer(layer_name, new_data)
             print(f"Updated: {layer_name} at {datetime.now().strftime('%H:%M:%S')}")
+        elif layer_name in self.feed_styles:
+            # First version of a feed requested from the buttons
+            self.map_engine.add_vector_layer(new_data, layer_name, self.feed_styles[layer_name])
+            self.layer_manager.available_layers[layer_name] = {
+                'type': 'vector', 
+                'data': new_data
+            }
+            print(f"{layer_name} added!")
+    
+    def on_close(self, event):
+        """Stop feed workers and free shared memory when the window closes"""
+        self.feed_timer.stop()
+        self.real_time_data.shutdown()
     
     def load_sample_data(self):
         """Load sample data for demonstration"""
@@ -170,7 +181,7 @@ class LayeredEarthApp:
         """Display the application"""
         plt.show()
 
-def launch_app():
+def launch_app(**kwargs):
     """Launch the Layered-Earth application"""
-    app = LayeredEarthApp()
+    app = LayeredEarthApp(**kwargs)
     return app
\ No newline at end of file